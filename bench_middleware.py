@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""
+Measures the requests/sec of a trivial WSGI and ASGI application, bare, behind the license
+middleware and behind a naive middleware calling is_activated() on every request.
+
+The native library is replaced by a StubLibrary, so the numbers measure the overhead of the
+wrapper and of the middleware only.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import asyncio
+import sys
+from timeit import default_timer
+
+from turboactivate import TurboActivate
+from turboactivate.middleware import LicenseASGIMiddleware, LicenseMonitor, LicenseWSGIMiddleware
+from turboactivate.stub import StubLibrary
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+
+def wsgi_app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [b"ok"]
+
+
+async def asgi_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def naive_wsgi(ta, app):
+    def middleware(environ, start_response):
+        if not ta.is_activated():
+            start_response("403 Forbidden", [])
+            return []
+
+        return app(environ, start_response)
+
+    return middleware
+
+
+def bench_wsgi(app):
+    environ = {"REQUEST_METHOD": "GET", "PATH_INFO": "/reports"}
+
+    def start_response(status, headers):
+        pass
+
+    started = default_timer()
+
+    for _ in range(REQUESTS):
+        app(environ, start_response)
+
+    return REQUESTS / (default_timer() - started)
+
+
+def bench_asgi(app):
+    scope = {"type": "http", "path": "/reports"}
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        pass
+
+    async def run():
+        started = default_timer()
+
+        for _ in range(REQUESTS):
+            await app(scope, receive, send)
+
+        return REQUESTS / (default_timer() - started)
+
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    ta = TurboActivate(b"TurboActivate.dat", b"guid", library=StubLibrary())
+
+    monitor = LicenseMonitor(ta)
+    monitor.start()
+
+    try:
+        print("WSGI bare:       %10.0f req/s" % bench_wsgi(wsgi_app))
+        print("WSGI middleware: %10.0f req/s" % bench_wsgi(LicenseWSGIMiddleware(wsgi_app, monitor)))
+        print("WSGI naive:      %10.0f req/s" % bench_wsgi(naive_wsgi(ta, wsgi_app)))
+        print("ASGI bare:       %10.0f req/s" % bench_asgi(asgi_app))
+        print("ASGI middleware: %10.0f req/s" % bench_asgi(LicenseASGIMiddleware(asgi_app, monitor)))
+        print("Monitor metrics:", monitor.metrics())
+    finally:
+        monitor.stop()
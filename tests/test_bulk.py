@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import multiprocessing
+import tempfile
+import unittest
+
+from turboactivate import TurboActivate, TA_E_PKEY, TA_FAIL, TA_E_INET
+from turboactivate import bulk
+from turboactivate.bulk import KeyResult, read_keys
+from turboactivate.stub import StubLibrary
+
+
+class ReadKeysTest(unittest.TestCase):
+    def test_lines(self):
+        self.assertEqual(list(read_keys(io.StringIO("AAA\n\n BBB \n"))), ["AAA", "BBB"])
+
+    def test_csv_columns(self):
+        self.assertEqual(list(read_keys(io.StringIO("id,key\n1,AAA\n2,\n3,BBB\n"), column="key")),
+                         ["AAA", "BBB"])
+        self.assertEqual(list(read_keys(io.StringIO("1,AAA\n2,BBB\n"), column=1)),
+                         ["AAA", "BBB"])
+
+
+class ValidateTest(unittest.TestCase):
+    def tearDown(self):
+        bulk._worker_ta = None
+        bulk._worker_error = None
+
+    def use_library(self, return_codes):
+        bulk._worker_ta = TurboActivate("TurboActivate.dat", "guid",
+                                        library=StubLibrary(return_codes))
+
+    def test_valid_key(self):
+        self.use_library({})
+        key = next(read_keys(io.StringIO("KEY\n")))
+
+        self.assertEqual(bulk._validate((0, key)), KeyResult(0, "KEY", True, None))
+        self.assertEqual(bulk._validate((1, b"KEY")), KeyResult(1, b"KEY", True, None))
+
+    def test_invalid_keys(self):
+        for return_code in (TA_E_PKEY, TA_FAIL):
+            self.use_library({"TA_CheckAndSavePKey": return_code})
+
+            self.assertEqual(bulk._validate((1, "KEY")), KeyResult(1, "KEY", False, None))
+
+    def test_other_errors(self):
+        self.use_library({"TA_CheckAndSavePKey": TA_E_INET})
+
+        self.assertEqual(bulk._validate((2, "KEY")),
+                         KeyResult(2, "KEY", False, "TurboActivateConnectionError"))
+
+    def test_unexpected_errors(self):
+        self.use_library({})
+
+        self.assertEqual(bulk._validate((3, 42)), KeyResult(3, 42, False, "AttributeError"))
+
+    def test_worker_setup_failure_is_reported(self):
+        bulk._init_worker("TurboActivate.dat", "guid", "/nonexistent", 0, tempfile.gettempdir())
+
+        result = bulk._validate((3, "KEY"))
+
+        self.assertEqual(result.index, 3)
+        self.assertFalse(result.valid)
+        self.assertTrue(result.error)
+
+
+class PathRecordingLibrary(StubLibrary):
+    paths = []
+
+    def call(self, name, args):
+        if name == "TA_SetCustomActDataPath":
+            self.paths.append(args[0].value)
+
+        return super(PathRecordingLibrary, self).call(name, args)
+
+
+class ValidateKeysTest(unittest.TestCase):
+    def setUp(self):
+        self.platform = bulk.sys.platform
+        self.load_library = bulk.load_library
+        bulk.sys.platform = "darwin"
+        bulk.load_library = lambda folder: PathRecordingLibrary(
+            {"TA_CheckAndSavePKey": TA_FAIL} if folder == "invalid" else {})
+
+    def tearDown(self):
+        bulk.sys.platform = self.platform
+        bulk.load_library = self.load_library
+        bulk._worker_ta = None
+        bulk._worker_error = None
+        del PathRecordingLibrary.paths[:]
+
+    def test_worker_setup(self):
+        bulk._init_worker("TurboActivate.dat", "guid", "", 0, tempfile.gettempdir())
+
+        self.assertIsNotNone(bulk._worker_ta)
+        self.assertIsInstance(PathRecordingLibrary.paths[0], type(bulk.native_text("")))
+
+    @unittest.skipUnless(multiprocessing.get_start_method() == "fork",
+                         "workers must inherit the stub library")
+    def test_streams_results_in_order(self):
+        keys = read_keys(io.StringIO("".join("KEY%d\n" % i for i in range(50))))
+        progress = []
+
+        results = list(bulk.validate_keys(keys, "TurboActivate.dat", "guid", processes=2,
+                                          chunksize=4, progress=progress.append,
+                                          progress_every=20))
+
+        self.assertEqual([result.key for result in results], ["KEY%d" % i for i in range(50)])
+        self.assertTrue(all(result.valid for result in results))
+        self.assertEqual([p.done for p in progress], [20, 40, 50])
+
+    @unittest.skipUnless(multiprocessing.get_start_method() == "fork",
+                         "workers must inherit the stub library")
+    def test_invalid_keys_in_pool(self):
+        results = list(bulk.validate_keys(["A", "B"], "TurboActivate.dat", "guid",
+                                          library_folder="invalid", processes=1))
+
+        self.assertEqual(results, [KeyResult(0, "A", False, None), KeyResult(1, "B", False, None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import math
+import unittest
+from datetime import datetime, timedelta
+
+from turboactivate import TurboActivate, TA_E_EXPIRED, TA_OK
+from turboactivate.stub import StubLibrary
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+EXPIRY = "2026-06-01 00-00-00"
+
+
+class ExpiringLibrary(StubLibrary):
+    """Dates before EXPIRY are valid."""
+
+    def __init__(self):
+        super(ExpiringLibrary, self).__init__()
+        self.checked = []
+
+    def call(self, name, args):
+        if name != "TA_IsDateValid":
+            return super(ExpiringLibrary, self).call(name, args)
+
+        date = args[1].value
+
+        if isinstance(date, bytes):
+            date = date.decode("utf-8")
+
+        self.checked.append(date)
+
+        return TA_OK if date < EXPIRY else TA_E_EXPIRED
+
+
+class DatesTest(unittest.TestCase):
+    def setUp(self):
+        self.lib = ExpiringLibrary()
+        self.ta = TurboActivate(b"TurboActivate.dat", b"guid", library=self.lib)
+
+    def test_is_date_valid(self):
+        self.assertTrue(self.ta.is_date_valid(datetime(2026, 1, 1)))
+        self.assertFalse(self.ta.is_date_valid(datetime(2027, 1, 1)))
+        self.assertTrue(self.ta.is_date_valid("2026-01-01 00-00-00"))
+        self.assertFalse(self.ta.is_date_valid(b"2027-01-01 00-00-00"))
+
+    def test_mixed_inputs(self):
+        dates = [
+            datetime(2026, 1, 1),
+            "2027-01-01 00-00-00",
+            b"2026-05-31 23-59-59",
+            datetime(2026, 1, 1),
+            None,
+            b"2026-06-01 00-00-00",
+        ]
+        now_valid = datetime.utcnow().strftime("%Y-%m-%d %H-%M-%S") < EXPIRY
+
+        self.assertEqual(self.ta.are_dates_valid(dates),
+                         [True, False, True, True, now_valid, False])
+        self.assertLessEqual(len(self.lib.checked), math.ceil(math.log(5, 2)) + 1)
+
+    def test_native_calls_are_logarithmic(self):
+        start = datetime(2026, 1, 1)
+        dates = [start + timedelta(days=i) for i in range(1000)]
+
+        result = self.ta.are_dates_valid(dates)
+
+        self.assertEqual(result, [date < datetime(2026, 6, 1) for date in dates])
+        self.assertLessEqual(len(self.lib.checked), math.ceil(math.log(1000, 2)) + 1)
+
+    def test_unpadded_strings_sort_chronologically(self):
+        dates = ["2026-5-1 00-00-00", "2026-07-01 00-00-00", "2026-05-31 23:59:59", "2026-6-1"]
+
+        self.assertEqual(self.ta.are_dates_valid(dates), [True, False, True, False])
+
+    def test_unrecognized_string(self):
+        with self.assertRaises(ValueError):
+            self.ta.are_dates_valid(["01/05/2026"])
+
+        self.assertEqual(self.lib.checked, [])
+
+    def test_empty(self):
+        self.assertEqual(self.ta.are_dates_valid([]), [])
+        self.assertEqual(self.lib.checked, [])
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_datetime64(self):
+        dates = numpy.array(["2026-01-01T00:00", "2027-01-01", "2026-01-01"],
+                            dtype="datetime64[m]")
+
+        result = self.ta.are_dates_valid(dates)
+
+        self.assertEqual(result.dtype, bool)
+        self.assertEqual(result.tolist(), [True, False, True])
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_multidimensional_array(self):
+        dates = numpy.array([["2026-01-01", "2027-01-01"]], dtype="datetime64[D]")
+
+        with self.assertRaises(ValueError):
+            self.ta.are_dates_valid(dates)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import unittest
+from datetime import datetime
+
+from turboactivate import TurboActivate, TA_E_FEATURES_CHANGED, TurboActivateFailError
+from turboactivate.entitlements import Entitlements, FeatureGate
+from turboactivate.stub import StubLibrary
+
+
+class FakeTurboActivate(object):
+    def __init__(self, features):
+        self.features = features
+        self.callbacks = []
+
+    def get_feature_value(self, name):
+        if name not in self.features:
+            raise TurboActivateFailError()
+
+        return self.features[name]
+
+    def on_features_changed(self, callback):
+        self.callbacks.append(callback)
+
+
+VALUES = {"pro": True, "seats": 12, "plan": "team", "expires": datetime(2026, 1, 1)}
+
+
+class FeatureGateTest(unittest.TestCase):
+    def check(self, expression, expected):
+        self.assertEqual(FeatureGate(expression)(VALUES), expected, expression)
+
+    def test_boolean_operators(self):
+        self.check("pro", True)
+        self.check("not pro", False)
+        self.check("pro and seats >= 10", True)
+        self.check("pro and seats >= 20", False)
+        self.check("seats >= 20 or plan == 'team'", True)
+
+    def test_comparisons(self):
+        self.check("seats == 12", True)
+        self.check("seats != 12", False)
+        self.check("seats < 12", False)
+        self.check("seats <= 12", True)
+        self.check("seats > 11", True)
+        self.check("plan in ('team', 'enterprise')", True)
+        self.check("plan not in ['team']", False)
+
+    def test_chained_comparisons(self):
+        self.check("10 <= seats < 13", True)
+        self.check("10 <= seats < 12", False)
+        self.check("1 < 2 < seats", True)
+
+    def test_missing_features(self):
+        self.check("missing", False)
+        self.check("not missing", True)
+        self.check("missing == 0", False)
+        self.check("missing != 0", False)
+        self.check("seats > missing", False)
+
+    def test_dates_against_literals(self):
+        self.check("expires > '2025-01-01'", True)
+        self.check("'2025-01-01' < expires", True)
+        self.check("expires < '2025-01-01 00:00:00'", False)
+        self.check("'2025-01-01' > expires", False)
+        self.check("'2025-01-01' < expires < '2027-01-01'", True)
+
+    def test_incomparable_types(self):
+        self.check("plan > 3", False)
+
+    def test_rejected_nodes(self):
+        for expression in ("__import__('os')", "pro.real", "seats + 1 > 2", "seats[0]",
+                           "lambda: 1", "pro if seats else plan", "seats is 1", "pro and"):
+            with self.assertRaises(ValueError, msg=expression):
+                FeatureGate(expression)
+
+
+class EntitlementsTest(unittest.TestCase):
+    def test_parses_schema(self):
+        ta = FakeTurboActivate({"pro": b"yes", "seats": b"12", "expires": b"2026-01-01",
+                                "config": b'{"a": [1, 2]}', "empty": b""})
+        entitlements = Entitlements(ta, {"pro": "bool", "seats": "int", "expires": "date",
+                                         "config": "json", "empty": "str", "missing": "str"})
+
+        self.assertEqual(entitlements.values(), {
+            "pro": True,
+            "seats": 12,
+            "expires": datetime(2026, 1, 1),
+            "config": {"a": [1, 2]},
+        })
+        self.assertFalse(entitlements.has_feature("missing"))
+        self.assertTrue(entitlements.allows("pro and seats >= 10"))
+        self.assertIs(entitlements.compile("pro"), entitlements.compile("pro"))
+
+    def test_refresh_on_features_changed(self):
+        ta = FakeTurboActivate({"seats": b"12"})
+        entitlements = Entitlements(ta, {"seats": "int"})
+
+        ta.features["seats"] = b"5"
+        ta.callbacks[0]()
+
+        self.assertEqual(entitlements["seats"], 5)
+
+    def test_invalid_value_keeps_last_snapshot(self):
+        ta = FakeTurboActivate({"seats": b"12"})
+        entitlements = Entitlements(ta, {"seats": "int"})
+
+        ta.features["seats"] = b"many"
+
+        with self.assertRaises(ValueError):
+            entitlements.refresh()
+
+        self.assertEqual(entitlements["seats"], 12)
+
+
+class RealTurboActivateTest(unittest.TestCase):
+    def test_text_feature_names(self):
+        library = StubLibrary(features={"pro": "yes", "seats": "12"})
+        ta = TurboActivate("TurboActivate.dat", "guid", library=library)
+
+        entitlements = Entitlements(ta, {"pro": "bool", "seats": "int", "missing": "str"})
+
+        self.assertEqual(entitlements.values(), {"pro": True, "seats": 12})
+        self.assertTrue(entitlements.allows("pro and seats >= 10"))
+
+    def test_refresh_on_features_changed(self):
+        library = StubLibrary({"TA_IsGenuine": TA_E_FEATURES_CHANGED}, features={"seats": "12"})
+        ta = TurboActivate("TurboActivate.dat", "guid", library=library)
+        entitlements = Entitlements(ta, {"seats": "int"})
+
+        library.features["seats"] = "5"
+
+        self.assertTrue(ta.is_genuine())
+        self.assertEqual(entitlements["seats"], 5)
+
+
+class FeaturesChangedCallbackTest(unittest.TestCase):
+    def test_failing_callback_does_not_fail_is_genuine(self):
+        ta = TurboActivate(b"TurboActivate.dat", b"guid",
+                           library=StubLibrary({"TA_IsGenuine": TA_E_FEATURES_CHANGED}))
+        calls = []
+
+        def failing():
+            calls.append("failing")
+            raise ValueError("invalid feature")
+
+        ta.on_features_changed(failing)
+        ta.on_features_changed(lambda: calls.append("next"))
+
+        self.assertTrue(ta.is_genuine())
+        self.assertEqual(calls, ["failing", "next"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import unittest
+from ctypes import sizeof
+
+from turboactivate import (GENUINE_OPTIONS, GenuineFlags, GenuineOptions, TurboActivate,
+                           TrialFlags, TA_SYSTEM, TA_UNVERIFIED_TRIAL, TA_USER, TA_VERIFIED_TRIAL)
+from turboactivate.stub import StubLibrary
+
+
+class GenuineOptionsTest(unittest.TestCase):
+    def test_fields(self):
+        options = GenuineOptions(flags=GenuineFlags.SKIP_OFFLINE | GenuineFlags.DISALLOW_VM,
+                                 grace_days=14, days_between_checks=90)
+        contents = options.get_pointer().contents
+
+        self.assertEqual(contents.nLength, sizeof(GENUINE_OPTIONS))
+        self.assertEqual(contents.flags, 0x00000005)
+        self.assertEqual(contents.nGraceDaysOnInetErr, 14)
+        self.assertEqual(contents.nDaysBetweenChecks, 90)
+
+    def test_same_pointer_every_call(self):
+        options = GenuineOptions()
+        pointer = options.get_pointer()
+
+        options.flags(GenuineFlags.DISALLOW_SANDBOX)
+        options.grace_days(7)
+
+        self.assertIs(options.get_pointer(), pointer)
+        self.assertEqual(pointer.contents.flags, GenuineFlags.DISALLOW_SANDBOX)
+        self.assertEqual(pointer.contents.nGraceDaysOnInetErr, 7)
+
+    def test_frozen(self):
+        options = GenuineOptions(grace_days=14).freeze()
+
+        for setter, value in ((options.flags, 1), (options.grace_days, 1),
+                              (options.days_between_checks, 1)):
+            with self.assertRaises(AttributeError):
+                setter(value)
+
+        with self.assertRaises(AttributeError):
+            options.extra = 1
+
+        self.assertEqual(options.get_pointer().contents.nGraceDaysOnInetErr, 14)
+
+
+class TrialFlagsTest(unittest.TestCase):
+    def test_trial_flags(self):
+        ta = TurboActivate(b"TurboActivate.dat", b"guid", library=StubLibrary())
+        self.assertEqual(ta._trial_flags, TA_VERIFIED_TRIAL | TA_USER)
+
+        ta = TurboActivate(b"TurboActivate.dat", b"guid", library=StubLibrary(), mode=TA_SYSTEM,
+                           verified_trials=False)
+        self.assertEqual(ta._trial_flags, TA_UNVERIFIED_TRIAL | TA_SYSTEM)
+        self.assertEqual(TrialFlags.UNVERIFIED_TRIAL | TrialFlags.SYSTEM, ta._trial_flags)
+
+
+if __name__ == "__main__":
+    unittest.main()
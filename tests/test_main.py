@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import json
+import sys
+import unittest
+
+from turboactivate.__main__ import BENCH_METHODS, main
+from turboactivate.c_wrapper import TA_E_INET, TA_FAIL
+from turboactivate.stub import StubLibrary
+
+
+class ArgumentsTest(unittest.TestCase):
+    def test_rejects_non_positive_counts(self):
+        for argv in (["bench", "-p", "a", "b", "-n", "0"],
+                     ["bench", "-p", "a", "b", "-n", "-3"],
+                     ["status", "-p", "a", "b", "-j", "0"]):
+            with self.assertRaises(SystemExit) as cm:
+                main(argv)
+
+            self.assertEqual(cm.exception.code, 2, argv)
+
+
+class CommandsTest(unittest.TestCase):
+    def setUp(self):
+        self.stdout = sys.stdout
+        sys.stdout = io.StringIO()
+
+    def tearDown(self):
+        sys.stdout = self.stdout
+
+    def run_main(self, argv, library):
+        code = main(argv, library=library)
+
+        return code, json.loads(sys.stdout.getvalue())
+
+    def test_status(self):
+        library = StubLibrary({"TA_IsActivated": TA_FAIL}, features={"pro": "yes"}, trial_days=7)
+
+        code, reports = self.run_main(["status", "-p", "a.dat", "guid1", "-p", "b.dat", "guid2",
+                                       "-f", "pro", "--genuine", "--trial"], library)
+
+        self.assertEqual(code, 0)
+        self.assertEqual(reports, [
+            {"dat_file": dat_file, "guid": guid, "activated": False, "genuine": True,
+             "features": {"pro": "yes"}, "trial_days_remaining": 7}
+            for dat_file, guid in (("a.dat", "guid1"), ("b.dat", "guid2"))])
+
+    def test_status_reports_errors(self):
+        library = StubLibrary({"TA_IsGenuine": TA_E_INET})
+
+        code, reports = self.run_main(["status", "-p", "a.dat", "guid", "--genuine"], library)
+
+        self.assertEqual(code, 1)
+        self.assertTrue(reports[0]["error"].startswith("TurboActivateConnectionError"))
+
+    def test_activate(self):
+        code, reports = self.run_main(["activate", "-p", "a.dat", "guid", "-k", "KEY"],
+                                      StubLibrary())
+
+        self.assertEqual(code, 0)
+        self.assertEqual(reports, [{"dat_file": "a.dat", "guid": "guid", "activated": True}])
+
+    def test_deactivate(self):
+        library = StubLibrary({"TA_IsActivated": TA_FAIL})
+
+        code, reports = self.run_main(["deactivate", "-p", "a.dat", "guid", "--keep-key"],
+                                      library)
+
+        self.assertEqual(code, 0)
+        self.assertEqual(reports, [{"dat_file": "a.dat", "guid": "guid", "activated": False}])
+
+    def test_bench(self):
+        code, reports = self.run_main(["bench", "-p", "a.dat", "guid", "-n", "10"],
+                                      StubLibrary())
+
+        self.assertEqual(code, 0)
+        self.assertEqual(sorted(reports), sorted(BENCH_METHODS))
+
+        for report in reports.values():
+            self.assertLessEqual(report["p50_us"], report["max_us"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import asyncio
+import time
+import unittest
+
+from turboactivate import TurboActivate
+from turboactivate.c_wrapper import TA_FAIL
+from turboactivate.middleware import LicenseASGIMiddleware, LicenseMonitor, LicenseWSGIMiddleware
+from turboactivate.stub import StubLibrary
+
+
+class FakeTurboActivate(object):
+    def __init__(self, activated=True, features=()):
+        self.activated = activated
+        self.features = set(features)
+        self.calls = 0
+
+    def is_activated(self):
+        self.calls += 1
+        return self.activated
+
+    def has_feature(self, name):
+        self.calls += 1
+        return name in self.features
+
+
+def wsgi_app(environ, start_response):
+    start_response("200 OK", [])
+    return [b"ok"]
+
+
+class WSGIMiddlewareTest(unittest.TestCase):
+    def request(self, app, path):
+        statuses = []
+        app({"PATH_INFO": path}, lambda status, headers: statuses.append(status))
+
+        return statuses[0]
+
+    def test_routes(self):
+        ta = FakeTurboActivate(features=["pro"])
+        monitor = LicenseMonitor(ta, features=["pro", "reports"])
+        app = LicenseWSGIMiddleware(wsgi_app, monitor,
+                                    routes=[("/reports", "pro and reports"), ("/pro", "pro")])
+
+        self.assertEqual(self.request(app, "/"), "403 Forbidden")
+
+        monitor.refresh()
+        calls = ta.calls
+
+        self.assertEqual(self.request(app, "/"), "200 OK")
+        self.assertEqual(self.request(app, "/pro/x"), "200 OK")
+        self.assertEqual(self.request(app, "/reports"), "403 Forbidden")
+        self.assertEqual(ta.calls, calls)
+
+        ta.activated = False
+        monitor.refresh()
+
+        self.assertEqual(self.request(app, "/"), "403 Forbidden")
+
+    def test_stale_verdict_is_denied(self):
+        monitor = LicenseMonitor(FakeTurboActivate(), interval=60, max_age=0.01)
+        app = LicenseWSGIMiddleware(wsgi_app, monitor)
+        monitor.refresh()
+
+        self.assertEqual(self.request(app, "/"), "200 OK")
+
+        time.sleep(0.02)
+
+        self.assertEqual(self.request(app, "/"), "403 Forbidden")
+        self.assertTrue(monitor.metrics()["verdict_stale"])
+
+
+class RealTurboActivateTest(unittest.TestCase):
+    def test_start(self):
+        library = StubLibrary(features={"pro": "1"})
+        monitor = LicenseMonitor(TurboActivate("TurboActivate.dat", "guid", library=library),
+                                 features=["pro", "reports"])
+        monitor.start()
+
+        try:
+            self.assertEqual(monitor.current_verdict().features, {"pro": True, "reports": False})
+            self.assertTrue(monitor.current_verdict().activated)
+            self.assertEqual(monitor.refresh_errors, 0)
+        finally:
+            monitor.stop()
+
+    def test_not_activated(self):
+        library = StubLibrary({"TA_IsActivated": TA_FAIL}, features={"pro": "1"})
+        monitor = LicenseMonitor(TurboActivate("TurboActivate.dat", "guid", library=library),
+                                 features=["pro"])
+        monitor.refresh()
+
+        self.assertFalse(monitor.current_verdict().activated)
+
+
+class ASGIMiddlewareTest(unittest.TestCase):
+    def test_denied(self):
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+
+        monitor = LicenseMonitor(FakeTurboActivate(activated=False))
+        monitor.refresh()
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(LicenseASGIMiddleware(app, monitor, status=402)(
+            {"type": "http", "path": "/"}, None, send))
+
+        self.assertEqual(messages[0]["status"], 402)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import unittest
+
+from turboactivate import TurboActivate
+from turboactivate import soak
+from turboactivate.soak import SoakFailure, SoakSample
+
+
+def sample(iterations=10, handles=4, handle_calls=50, instances=2):
+    return SoakSample(1.0, iterations, None, None, 0, handles, handle_calls, instances)
+
+
+class CheckHandlesTest(unittest.TestCase):
+    def test_within_bounds(self):
+        soak._check_handles(sample(), products=4, threads=2)
+
+    def test_too_many_handles(self):
+        with self.assertRaises(SoakFailure):
+            soak._check_handles(sample(handles=5), products=4, threads=2)
+
+    def test_too_many_handle_calls(self):
+        with self.assertRaises(SoakFailure):
+            soak._check_handles(sample(handle_calls=61), products=4, threads=2)
+
+    def test_leaked_instances(self):
+        with self.assertRaises(SoakFailure):
+            soak._check_handles(sample(instances=5), products=4, threads=2)
+
+
+class LeakingTurboActivate(TurboActivate):
+    leaked = []
+
+    def __init__(self, *args, **kwargs):
+        super(LeakingTurboActivate, self).__init__(*args, **kwargs)
+        self.leaked.append(self)
+
+
+class SoakTest(unittest.TestCase):
+    def run_soak(self):
+        return soak.soak(0.3, threads=2, products=2, sample_interval=0.1, settle=0)
+
+    def test_passes(self):
+        samples = self.run_soak()
+
+        self.assertTrue(samples)
+        self.assertLessEqual(samples[-1].handles, 2)
+
+    def test_detects_leaked_instances(self):
+        soak.TurboActivate = LeakingTurboActivate
+
+        try:
+            with self.assertRaises(SoakFailure):
+                self.run_soak()
+        finally:
+            soak.TurboActivate = TurboActivate
+            del LeakingTurboActivate.leaked[:]
+
+
+class ArgumentsTest(unittest.TestCase):
+    def test_rejects_non_positive_counts(self):
+        for argv in (["-p", "0"], ["-t", "0"], ["-t", "-2"]):
+            with self.assertRaises(SystemExit) as cm:
+                soak.main(argv)
+
+            self.assertEqual(cm.exception.code, 2, argv)
+
+
+if __name__ == "__main__":
+    unittest.main()
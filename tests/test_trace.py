@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import unittest
+
+from turboactivate import (TurboActivate, GenuineOptions, TA_E_ACTIVATE, validate_result,
+                           TurboActivateNotActivatedError)
+from turboactivate.stub import StubLibrary
+from turboactivate.trace import ReplayError, ReplayLibrary, TraceRecorder, load_trace
+
+
+class RememberingStringIO(io.StringIO):
+    def close(self):
+        self.closed_value = self.getvalue()
+        super(RememberingStringIO, self).close()
+
+
+def make_ta(library):
+    return TurboActivate(b"TurboActivate.dat", b"guid", library=library)
+
+
+class TraceTest(unittest.TestCase):
+    def test_record_and_replay(self):
+        stream = RememberingStringIO()
+        ta = make_ta(StubLibrary({"TA_IsActivated": TA_E_ACTIVATE}))
+
+        with TraceRecorder(stream) as recorder:
+            recorder.attach(ta)
+
+            self.assertFalse(ta.is_activated())
+            self.assertTrue(ta.is_genuine(GenuineOptions(flags=1)))
+
+        trace = load_trace(io.StringIO(stream.closed_value))
+
+        self.assertEqual([(r["fn"], r["rc"]) for r in trace],
+                         [("TA_IsActivated", TA_E_ACTIVATE), ("TA_IsGenuineEx", 0)])
+        self.assertEqual(trace[1]["args"][1]["flags"], 1)
+
+        library = ReplayLibrary(trace, timing=False)
+        replayed = make_ta(library)
+
+        self.assertFalse(replayed.is_activated())
+        self.assertTrue(replayed.is_genuine(GenuineOptions(flags=1)))
+        self.assertEqual(library.remaining(), 0)
+
+        with self.assertRaises(ReplayError):
+            replayed.is_activated()
+
+    def test_close_restores_library(self):
+        library = StubLibrary({"TA_IsActivated": TA_E_ACTIVATE})
+        ta = make_ta(library)
+        recorder = TraceRecorder(io.StringIO(), record_args=False)
+
+        recorder.attach(ta)
+        recorder.close()
+
+        self.assertIs(ta._lib, library)
+        self.assertIs(library.TA_IsActivated.restype, validate_result)
+        self.assertFalse(ta.is_activated())
+
+        with self.assertRaises(TurboActivateNotActivatedError):
+            ta._lib.TA_IsActivated(ta._handle)
+
+    def test_attach_twice(self):
+        ta = make_ta(StubLibrary())
+        recorder = TraceRecorder(io.StringIO())
+        recorder.attach(ta)
+
+        with self.assertRaises(ValueError):
+            TraceRecorder(io.StringIO()).attach(ta)
+
+        recorder.detach(ta)
+
+        with self.assertRaises(ValueError):
+            recorder.detach(ta)
+
+
+if __name__ == "__main__":
+    unittest.main()
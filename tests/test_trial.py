@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import unittest
+
+from turboactivate import TurboActivate
+from turboactivate.stub import StubLibrary
+from turboactivate.trial import SECONDS_PER_DAY, TrialTracker
+
+
+class CountingLibrary(StubLibrary):
+    def __init__(self, trial_days):
+        super(CountingLibrary, self).__init__(trial_days=trial_days)
+        self.trial_calls = 0
+
+    def call(self, name, args):
+        if name == "TA_TrialDaysRemaining":
+            self.trial_calls += 1
+
+        return super(CountingLibrary, self).call(name, args)
+
+
+class TrialTrackerTest(unittest.TestCase):
+    def setUp(self):
+        self.monotonic = 1000.0
+        self.wall = 1500000000.0
+        self.lib = CountingLibrary(trial_days=3)
+        self.ta = TurboActivate("TurboActivate.dat", "guid", library=self.lib)
+        self.tracker = TrialTracker(self.ta, resync_interval=3600, clock_jump_tolerance=60,
+                                    monotonic=lambda: self.monotonic,
+                                    wall_clock=lambda: self.wall)
+
+    def advance(self, seconds, wall_seconds=None):
+        self.monotonic += seconds
+        self.wall += seconds if wall_seconds is None else wall_seconds
+
+    def test_first_sync(self):
+        self.assertEqual(self.lib.trial_calls, 0)
+        self.assertEqual(self.tracker.days_remaining(), 3)
+        self.assertEqual(self.tracker.days_remaining(), 3)
+        self.assertEqual(self.lib.trial_calls, 1)
+
+    def test_rounds_up_and_expires(self):
+        tracker = TrialTracker(self.ta, resync_interval=10 * SECONDS_PER_DAY,
+                               monotonic=lambda: self.monotonic, wall_clock=lambda: self.wall)
+        tracker.days_remaining()
+
+        self.advance(1)
+        self.assertEqual(tracker.days_remaining(), 3)
+
+        self.advance(SECONDS_PER_DAY)
+        self.assertEqual(tracker.days_remaining(), 2)
+
+        self.advance(SECONDS_PER_DAY * 2 - 2)
+        self.assertEqual(tracker.days_remaining(), 1)
+
+        self.advance(1)
+        self.assertEqual(tracker.days_remaining(), 0)
+
+        self.advance(SECONDS_PER_DAY)
+        self.assertEqual(tracker.days_remaining(), 0)
+        self.assertEqual(self.lib.trial_calls, 1)
+
+    def test_resync_after_interval(self):
+        self.tracker.days_remaining()
+        self.lib.trial_days = 10
+
+        self.advance(3599)
+        self.assertEqual(self.tracker.days_remaining(), 3)
+        self.assertEqual(self.lib.trial_calls, 1)
+
+        self.advance(1)
+        self.assertEqual(self.tracker.days_remaining(), 10)
+        self.assertEqual(self.lib.trial_calls, 2)
+
+    def test_resync_on_wall_clock_jump(self):
+        self.tracker.days_remaining()
+        self.lib.trial_days = 1
+
+        self.advance(10, wall_seconds=70)
+        self.assertEqual(self.tracker.days_remaining(), 3)
+        self.assertEqual(self.lib.trial_calls, 1)
+
+        self.advance(10, wall_seconds=SECONDS_PER_DAY)
+        self.assertEqual(self.tracker.days_remaining(), 1)
+        self.assertEqual(self.lib.trial_calls, 2)
+
+        self.advance(10, wall_seconds=-120)
+        self.tracker.days_remaining()
+        self.assertEqual(self.lib.trial_calls, 3)
+
+    def test_invalidated_by_trial_changes(self):
+        self.tracker.days_remaining()
+
+        self.lib.trial_days = 10
+        self.tracker.use_trial()
+        self.assertEqual(self.tracker.days_remaining(), 10)
+        self.assertEqual(self.lib.trial_calls, 2)
+
+        self.lib.trial_days = 20
+        self.tracker.extend_trial("EXTENSION")
+        self.assertEqual(self.tracker.days_remaining(), 20)
+        self.assertEqual(self.lib.trial_calls, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import threading
+import time
+import unittest
+
+from turboactivate import TurboActivate, TA_E_ACTIVATE, TurboActivateGuidError
+from turboactivate import warmup
+from turboactivate.stub import StubLibrary
+from turboactivate.warmup import warm_up
+
+
+class SlowProduct(object):
+    """Takes delay seconds to initialize, fails for the "bad" GUID."""
+
+    def __init__(self, dat_file, guid, delay=0.0):
+        time.sleep(delay)
+
+        if guid == "bad":
+            raise TurboActivateGuidError()
+
+        self.guid = guid
+
+    def is_activated(self):
+        return self.guid != "inactive"
+
+
+class WarmUpTest(unittest.TestCase):
+    def test_order_and_errors(self):
+        products = [dict(dat_file="a.dat", guid=guid, delay=delay)
+                    for guid, delay in (("first", 0.05), ("bad", 0.0), ("inactive", 0.02))]
+
+        results = warm_up(products, factory=SlowProduct)
+
+        self.assertEqual([result.product["guid"] for result in results],
+                         ["first", "bad", "inactive"])
+        self.assertEqual(results[0].instance.guid, "first")
+        self.assertTrue(results[0].activated)
+        self.assertIsNone(results[0].error)
+        self.assertIsNone(results[1].instance)
+        self.assertIsInstance(results[1].error, TurboActivateGuidError)
+        self.assertFalse(results[2].activated)
+
+    def test_runs_in_parallel(self):
+        products = [dict(dat_file="a.dat", guid=str(i), delay=0.1) for i in range(8)]
+        started = time.time()
+
+        results = warm_up(products, factory=SlowProduct)
+
+        self.assertLess(time.time() - started, 0.5)
+
+        for result in results:
+            self.assertGreaterEqual(result.elapsed, 0.09)
+
+    def test_without_activation_check(self):
+        results = warm_up([dict(dat_file="a.dat", guid="inactive")], check_activation=False,
+                          factory=SlowProduct)
+
+        self.assertIsNone(results[0].activated)
+
+    def test_real_instances(self):
+        library = StubLibrary({"TA_IsActivated": TA_E_ACTIVATE})
+
+        results = warm_up([dict(dat_file=b"a.dat", guid=b"guid", library=library)])
+
+        self.assertIsInstance(results[0].instance, TurboActivate)
+        self.assertFalse(results[0].activated)
+
+    def test_empty(self):
+        self.assertEqual(warm_up([]), [])
+
+    def test_bounded_default_workers(self):
+        threads = set()
+
+        def factory(dat_file, guid):
+            threads.add(threading.current_thread().name)
+            time.sleep(0.01)
+
+            return SlowProduct(dat_file, guid)
+
+        warm_up([dict(dat_file="a.dat", guid=str(i)) for i in range(warmup.MAX_WORKERS + 16)],
+                factory=factory)
+
+        self.assertLessEqual(len(threads), warmup.MAX_WORKERS)
+
+
+if __name__ == "__main__":
+    unittest.main()
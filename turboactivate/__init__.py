@@ -25,35 +25,123 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import logging
 from datetime import datetime
 
 from ctypes import pointer, sizeof, c_uint32
 
 from .c_wrapper import *
 
+logger = logging.getLogger(__name__)
+
+try:
+    from enum import IntFlag
+except ImportError:
+    # Before Python 3.6 the flags below are plain ints.
+    IntFlag = int
+
+#
+# Utilities
+#
+
+
+_DATE_FORMATS = ("%Y-%m-%d %H-%M-%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+
+
+def _parse_date(date):
+    """Returns date, a datetime or a string (None meaning now), as a datetime."""
+    if not date:
+        date = datetime.utcnow()
+
+    if isinstance(date, datetime):
+        return date.replace(microsecond=0)
+
+    if isinstance(date, bytes):
+        date = date.decode("utf-8")
+
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(date, fmt)
+        except ValueError:
+            pass
+
+    raise ValueError("Unrecognized date: %r" % date)
+
+
+def _format_date(date):
+    """Returns date, a datetime or a string (None meaning now), as text."""
+    if not date:
+        date = datetime.utcnow()
+
+    if isinstance(date, datetime):
+        return date.strftime("%Y-%m-%d %H-%M-%S")
+
+    if isinstance(date, bytes):
+        return date.decode("utf-8")
+
+    return date
+
+
 #
 # Object oriented interface
 #
 
 
+class GenuineFlags(IntFlag):
+    """Flags for is_genuine(), see GenuineOptions"""
+
+    SKIP_OFFLINE = TA_SKIP_OFFLINE
+    OFFLINE_SHOW_INET_ERR = TA_OFFLINE_SHOW_INET_ERR
+    DISALLOW_VM = TA_DISALLOW_VM
+    DISALLOW_SANDBOX = TA_DISALLOW_SANDBOX
+
+
+class TrialFlags(IntFlag):
+    """Flags for use_trial(), trial_days_remaining() and extend_trial()"""
+
+    SYSTEM = TA_SYSTEM
+    USER = TA_USER
+    UNVERIFIED_TRIAL = TA_UNVERIFIED_TRIAL
+    VERIFIED_TRIAL = TA_VERIFIED_TRIAL
+
+
+_GENUINE_OPTIONS_SIZE = sizeof(GENUINE_OPTIONS)
+
+
 class GenuineOptions(object):
-    """A set of options to use with is_genuine()"""
+    """
+    A set of options to use with is_genuine()
 
-    FLAG_SKIP_OFFLINE = 0x00000001
-    FLAG_OFFLINE_SHOW_INET_ERR = 0x00000002
+    The options live in a single GENUINE_OPTIONS struct allocated once, which is passed by
+    reference on every check. Call freeze() once configured to make the options immutable.
+    """
+
+    FLAG_SKIP_OFFLINE = GenuineFlags.SKIP_OFFLINE
+    FLAG_OFFLINE_SHOW_INET_ERR = GenuineFlags.OFFLINE_SHOW_INET_ERR
+    FLAG_DISALLOW_VM = GenuineFlags.DISALLOW_VM
+    FLAG_DISALLOW_SANDBOX = GenuineFlags.DISALLOW_SANDBOX
+
+    __slots__ = ("_options", "_pointer", "_frozen")
 
     def __init__(self, flags=0, grace_days=0, days_between_checks=0):
-        self._flags = flags
-        self._grace_days = grace_days
-        self._days_between_checks = days_between_checks
+        self._options = GENUINE_OPTIONS(
+            _GENUINE_OPTIONS_SIZE, GenuineFlags(flags), days_between_checks, grace_days)
+        self._pointer = pointer(self._options)
+        self._frozen = False
 
     def get_pointer(self):
-        options = GENUINE_OPTIONS(
-            sizeof(GENUINE_OPTIONS()), self._flags, self._days_between_checks, self._grace_days)
-        return pointer(options)
+        return self._pointer
+
+    def freeze(self):
+        """Prevents any further change to the options. Returns self."""
+        self._frozen = True
+
+        return self
 
     def flags(self, flags):
-        self._flags = flags
+        """A combination of GenuineFlags"""
+        self._check_mutable()
+        self._options.flags = GenuineFlags(flags)
 
     def grace_days(self, days):
         """
@@ -63,11 +151,17 @@ class GenuineOptions(object):
 
         14 days is recommended.
         """
-        self._grace_days = days
+        self._check_mutable()
+        self._options.nGraceDaysOnInetErr = days
 
     def days_between_checks(self, days):
         """How often to contact the LimeLM servers for validation. 90 days recommended."""
-        self._days_between_checks = days
+        self._check_mutable()
+        self._options.nDaysBetweenChecks = days
+
+    def _check_mutable(self):
+        if self._frozen:
+            raise AttributeError("GenuineOptions are frozen")
 
 
 class TurboActivate(object):
@@ -77,9 +171,11 @@ class TurboActivate(object):
                  library_folder="",
                  mode=TA_USER,
                  use_trial=False,
-                 verified_trials=True):
-        self._lib = load_library(library_folder)
+                 verified_trials=True,
+                 library=None):
+        self._lib = library if library is not None else load_library(library_folder)
         self._verified_trials = verified_trials
+        self._features_changed_callbacks = []
 
         self._set_restype()
         self.set_current_product(dat_file, guid, mode=mode)
@@ -95,9 +191,7 @@ class TurboActivate(object):
     # Product management
 
     def use_trial(self):
-        flags = TA_VERIFIED_TRIAL | self._mode if self._verified_trials else TA_UNVERIFIED_TRIAL | self._mode
-
-        self._lib.TA_UseTrial(self._handle, flags, None)
+        self._lib.TA_UseTrial(self._handle, self._trial_flags, None)
 
     def set_current_product(self, dat_file, guid, mode=TA_USER):
         """
@@ -105,7 +199,9 @@ class TurboActivate(object):
         the same running process.
         """
         self._mode = mode
-        self._dat_file = wstr(dat_file)
+        trial = TrialFlags.VERIFIED_TRIAL if self._verified_trials else TrialFlags.UNVERIFIED_TRIAL
+        self._trial_flags = int(trial | mode)
+        self._dat_file = wstr(native_text(dat_file))
 
         try:
             self._lib.PDetsFromPath(self._dat_file)
@@ -113,7 +209,7 @@ class TurboActivate(object):
             # The dat file is already loaded
             pass
 
-        self._handle = self._lib.TA_GetHandle(wstr(guid))
+        self._handle = self._lib.TA_GetHandle(wstr(native_text(guid)))
 
     # Product key
 
@@ -134,7 +230,7 @@ class TurboActivate(object):
 
     def set_product_key(self, product_key):
         """Checks and saves the product key."""
-        self._lib.TA_CheckAndSavePKey(self._handle, wstr(product_key), self._mode)
+        self._lib.TA_CheckAndSavePKey(self._handle, wstr(native_text(product_key)), self._mode)
 
     def is_product_key_valid(self):
         """
@@ -162,7 +258,10 @@ class TurboActivate(object):
         """
         e = 1 if erase_p_key else 0
         fn = self._lib.TA_DeactivationRequestToFile if deactivation_request_file else self._lib.TA_Deactivate
-        args = [wstr(deactivation_request_file)] if deactivation_request_file else []
+        args = []
+
+        if deactivation_request_file:
+            args.append(wstr(native_text(deactivation_request_file)))
 
         args.append(e)
 
@@ -183,7 +282,7 @@ class TurboActivate(object):
             return False
 
         fn = self._lib.TA_ActivationRequestToFile if activation_request_file else self._lib.TA_Activate
-        args = [wstr(activation_request_file)] if activation_request_file else []
+        args = [wstr(native_text(activation_request_file))] if activation_request_file else []
 
         args.append(None)
 
@@ -199,7 +298,7 @@ class TurboActivate(object):
 
     def activate_from_file(self, filename):
         """Activate from the "activation response" file for offline activation."""
-        self._lib.ActivateFromFile(self._handle, wstr(filename))
+        self._lib.ActivateFromFile(self._handle, wstr(native_text(filename)))
 
     def get_extra_data(self):
         """Gets the extra data you passed in using activate()"""
@@ -229,15 +328,22 @@ class TurboActivate(object):
 
     def get_feature_value(self, name):
         """Gets the value of a feature."""
-        buf_size = self._lib.GetFeatureValue(wstr(name), 0, 0)
+        buf_size = self._lib.GetFeatureValue(wstr(native_text(name)), 0, 0)
         buf = wbuf(buf_size)
 
-        self._lib.GetFeatureValue(wstr(name), buf, buf_size)
+        self._lib.GetFeatureValue(wstr(native_text(name)), buf, buf_size)
 
         return buf.value
 
     # Genuine
 
+    def on_features_changed(self, callback):
+        """
+        Registers a callable invoked with no arguments whenever is_genuine() reactivates
+        the product and the features have changed.
+        """
+        self._features_changed_callbacks.append(callback)
+
     def is_genuine(self, options=None):
         """
         Checks whether the computer is genuinely activated by verifying with the LimeLM servers.
@@ -257,6 +363,13 @@ class TurboActivate(object):
 
             return True
         except TurboActivateFeaturesChangedError:
+            for callback in self._features_changed_callbacks:
+                # The check itself succeeded, a failing callback must not turn it into an error.
+                try:
+                    callback()
+                except Exception:
+                    logger.exception("Features changed callback %r failed", callback)
+
             return True
 
     # Trial
@@ -269,18 +382,16 @@ class TurboActivate(object):
 
         You must have called "use_trial" o use this function
         """
-        flags = TA_VERIFIED_TRIAL | self._mode if self._verified_trials else TA_UNVERIFIED_TRIAL | self._mode
         days = c_uint32(0)
 
-        self._lib.TA_TrialDaysRemaining(self._handle, flags, pointer(days))
+        self._lib.TA_TrialDaysRemaining(self._handle, self._trial_flags, pointer(days))
 
         return days.value
 
     def extend_trial(self, extension_code):
         """Extends the trial using a trial extension created in LimeLM."""
-        flags = TA_VERIFIED_TRIAL | self._mode if self._verified_trials else TA_UNVERIFIED_TRIAL | self._mode
-
-        self._lib.TA_ExtendTrial(self._handle, flags, wstr(extension_code))
+        self._lib.TA_ExtendTrial(
+            self._handle, self._trial_flags, wstr(native_text(extension_code)))
 
     # Utils
 
@@ -288,13 +399,9 @@ class TurboActivate(object):
         """
         Check if the date is valid
         """
-        if not date:
-            to_check = datetime.utcnow().strftime("%Y-%m-%d %H-%M-%S")
-        else:
-            to_check = date
-
         try:
-            self._lib.TA_IsDateValid(self._handle, wstr(to_check), TA_HAS_NOT_EXPIRED)
+            self._lib.TA_IsDateValid(
+                self._handle, wstr(native_text(_format_date(date))), TA_HAS_NOT_EXPIRED)
 
             return True
         except TurboActivateFlagsError as e:
@@ -302,6 +409,55 @@ class TurboActivate(object):
         except TurboActivateError:
             return False
 
+    def are_dates_valid(self, dates):
+        """
+        Check a batch of dates at once. dates can be an iterable of datetimes or strings (text
+        or bytes, formatted as "YYYY-MM-DD HH-MM-SS", "YYYY-MM-DD HH:MM:SS" or "YYYY-MM-DD") or
+        a one-dimensional NumPy datetime64 array. As with is_date_valid(), a missing date (None
+        or NaT) means now. Raises ValueError for strings in other formats.
+
+        Since validity is monotonic in time, the dates are deduplicated and sorted, and the
+        expiry boundary is found with a binary search, i.e. with O(log n) native calls.
+
+        Returns a list of booleans aligned with dates, or a boolean array if dates is a
+        NumPy array.
+        """
+        is_array = hasattr(dates, "dtype")
+
+        if is_array:
+            if dates.ndim != 1:
+                raise ValueError("dates must be a one-dimensional array")
+
+            # datetime64 values become datetime objects (or None for NaT).
+            dates = dates.astype("datetime64[s]").astype(object)
+
+        # Sort parsed dates rather than strings, whose order may not be chronological.
+        now = _parse_date(None)
+        to_check = [_parse_date(date) if date else now for date in dates]
+        unique = sorted(set(to_check))
+
+        # Dates before the expiry are valid and later ones are not, so search for the first
+        # invalid one.
+        lo, hi = 0, len(unique)
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+
+            if self.is_date_valid(unique[mid]):
+                lo = mid + 1
+            else:
+                hi = mid
+
+        valid = set(unique[:lo])
+        result = [date in valid for date in to_check]
+
+        if is_array:
+            import numpy
+
+            return numpy.array(result, dtype=bool)
+
+        return result
+
     def set_custom_path(self, path):
         """
         This function allows you to set a custom folder to store the activation
@@ -324,7 +480,7 @@ class TurboActivate(object):
         if sys.platform.startswith('linux'):
             raise RuntimeError("set_custom_path is not available under linux")
 
-        self._lib.TA_SetCustomActDataPath(wstr(path))
+        self._lib.TA_SetCustomActDataPath(wstr(native_text(path)))
 
     def set_custom_proxy(self, address):
         """
@@ -338,28 +494,12 @@ class TurboActivate(object):
 
         If the port is not specified, TurboActivate will default to using port 1080 for proxies.
         """
-        self._lib.SetCustomProxy(wstr(address))
+        self._lib.SetCustomProxy(wstr(native_text(address)))
 
     def _set_restype(self):
-        self._lib.PDetsFromPath.restype = validate_result
-        self._lib.TA_UseTrial.restype = validate_result
-        self._lib.TA_GetPKey.restype = validate_result
-        self._lib.TA_CheckAndSavePKey.restype = validate_result
-        self._lib.TA_IsProductKeyValid.restype = validate_result
-        self._lib.TA_DeactivationRequestToFile.restype = validate_result
-        self._lib.TA_Deactivate.restype = validate_result
-        self._lib.TA_Activate.restype = validate_result
-        self._lib.TA_ActivationRequestToFile.restype = validate_result
-        self._lib.TA_ActivateFromFile.restype = validate_result
-        self._lib.TA_GetExtraData.restype = validate_result
-        self._lib.TA_IsActivated.restype = validate_result
-        self._lib.TA_IsGenuine.restype = validate_result
-        self._lib.TA_IsGenuineEx.restype = validate_result
-        self._lib.TA_TrialDaysRemaining.restype = validate_result
-        self._lib.TA_ExtendTrial.restype = validate_result
-        self._lib.TA_IsDateValid.restype = validate_result
-        self._lib.SetCustomProxy.restype = validate_result
-
-        # SetCustomActDataPath is not defined under linux
-        if not sys.platform.startswith('linux'):
-            self._lib.TA_SetCustomActDataPath.restype = validate_result
+        for name in CHECKED_FUNCTIONS:
+            # SetCustomActDataPath is not defined under linux
+            if name == "TA_SetCustomActDataPath" and sys.platform.startswith('linux'):
+                continue
+
+            getattr(self._lib, name).restype = validate_result
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from timeit import default_timer
+
+from . import TA_SYSTEM, TA_USER, TurboActivateError
+from .warmup import warm_up
+
+BENCH_METHODS = ("is_activated", "is_product_key_valid", "product_key", "is_date_valid",
+                 "trial_days_remaining")
+
+
+def _describe(error):
+    message = str(error)
+
+    return "%s: %s" % (type(error).__name__, message) if message else type(error).__name__
+
+
+def _text(value):
+    return value.decode("utf-8", "replace") if isinstance(value, bytes) else value
+
+
+def _positive_int(value):
+    number = int(value)
+
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1, got %s" % value)
+
+    return number
+
+
+def _products(args):
+    mode = TA_SYSTEM if args.system else TA_USER
+
+    return [dict(dat_file=dat_file, guid=guid, library_folder=args.library_folder, mode=mode,
+                 library=args.library)
+            for dat_file, guid in args.product]
+
+
+def _for_each_product(args, action):
+    """Initializes every product in parallel and runs action(instance) on each of them."""
+    def run(result):
+        report = {"dat_file": result.product["dat_file"], "guid": result.product["guid"]}
+
+        if result.error is not None:
+            report["error"] = _describe(result.error)
+
+            return report
+
+        try:
+            report.update(action(result.instance))
+        except Exception as e:
+            report["error"] = _describe(e)
+
+        return report
+
+    results = warm_up(_products(args), max_workers=args.workers, check_activation=False)
+
+    with ThreadPoolExecutor(max_workers=args.workers or len(results) or 1) as executor:
+        return list(executor.map(run, results))
+
+
+def _dump(reports):
+    json.dump(reports, sys.stdout, indent=2, sort_keys=True)
+    print()
+
+    return 1 if any("error" in report for report in reports) else 0
+
+
+#
+# Commands
+#
+
+
+def status(args):
+    def snapshot(ta):
+        report = {"activated": ta.is_activated()}
+
+        if args.genuine:
+            report["genuine"] = ta.is_genuine()
+
+        if args.feature:
+            report["features"] = dict((name, _text(ta.get_feature_value(name)))
+                                      for name in args.feature)
+
+        if args.trial:
+            report["trial_days_remaining"] = ta.trial_days_remaining()
+
+        return report
+
+    return _dump(_for_each_product(args, snapshot))
+
+
+def activate(args):
+    def run(ta):
+        if args.product_key:
+            ta.set_product_key(args.product_key)
+
+        return {"activated": ta.activate() or ta.is_activated()}
+
+    return _dump(_for_each_product(args, run))
+
+
+def deactivate(args):
+    def run(ta):
+        ta.deactivate(erase_p_key=not args.keep_key)
+
+        return {"activated": ta.is_activated()}
+
+    return _dump(_for_each_product(args, run))
+
+
+def _percentile(latencies, fraction):
+    return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+
+def bench(args):
+    result = warm_up(_products(args)[:1], check_activation=False)[0]
+
+    if result.error is not None:
+        print(_describe(result.error), file=sys.stderr)
+
+        return 1
+
+    reports = {}
+
+    for method in args.method or BENCH_METHODS:
+        fn = getattr(result.instance, method)
+        latencies = []
+        started = default_timer()
+
+        for _ in range(args.iterations):
+            call_started = default_timer()
+
+            try:
+                fn()
+            except TurboActivateError:
+                pass
+
+            latencies.append(default_timer() - call_started)
+
+        elapsed = default_timer() - started
+        latencies.sort()
+
+        reports[method] = {
+            "calls_per_second": args.iterations / elapsed if elapsed else None,
+            "mean_us": sum(latencies) / len(latencies) * 1e6,
+            "p50_us": _percentile(latencies, 0.50) * 1e6,
+            "p95_us": _percentile(latencies, 0.95) * 1e6,
+            "p99_us": _percentile(latencies, 0.99) * 1e6,
+            "max_us": latencies[-1] * 1e6,
+        }
+
+    json.dump(reports, sys.stdout, indent=2, sort_keys=True)
+    print()
+
+    return 0
+
+
+def main(argv=None, library=None):
+    """
+    Runs the command line tool. library, if given, replaces the native library of every
+    product, e.g. a StubLibrary.
+    """
+    parser = argparse.ArgumentParser(prog="python -m turboactivate",
+                                     description="Inspect and manage TurboActivate licensing.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-p", "--product", nargs=2, action="append", required=True,
+                        metavar=("DAT_FILE", "GUID"), help="product to act on (repeatable)")
+    common.add_argument("-l", "--library-folder", default="",
+                        help="folder containing the TurboActivate library")
+    common.add_argument("--system", action="store_true",
+                        help="use system-wide (TA_SYSTEM) instead of per-user activation")
+    common.add_argument("-j", "--workers", type=_positive_int, default=None,
+                        help="number of products evaluated in parallel")
+
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    cmd = commands.add_parser("status", parents=[common],
+                              help="print a JSON snapshot of the licensing status")
+    cmd.add_argument("-f", "--feature", action="append", help="feature to read (repeatable)")
+    cmd.add_argument("--genuine", action="store_true",
+                     help="also verify with the LimeLM servers")
+    cmd.add_argument("--trial", action="store_true", help="also report trial days remaining")
+    cmd.set_defaults(func=status)
+
+    cmd = commands.add_parser("activate", parents=[common], help="activate the products")
+    cmd.add_argument("-k", "--product-key", help="product key to save before activating")
+    cmd.set_defaults(func=activate)
+
+    cmd = commands.add_parser("deactivate", parents=[common], help="deactivate the products")
+    cmd.add_argument("--keep-key", action="store_true", help="don't erase the product key")
+    cmd.set_defaults(func=deactivate)
+
+    cmd = commands.add_parser("bench", parents=[common],
+                              help="measure the latency of the native library (first product)")
+    cmd.add_argument("-n", "--iterations", type=_positive_int, default=1000,
+                     help="calls per method (default: 1000)")
+    cmd.add_argument("-m", "--method", action="append", choices=BENCH_METHODS,
+                     help="method to measure (repeatable, default: all)")
+    cmd.set_defaults(func=bench)
+
+    args = parser.parse_args(argv)
+    args.library = library
+
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
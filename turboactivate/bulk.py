@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import csv
+import io
+import os
+import shutil
+import sys
+import tempfile
+from collections import namedtuple
+from multiprocessing import Pool
+from timeit import default_timer
+
+from . import TurboActivate
+from .c_wrapper import (TA_USER, TurboActivateFailError, TurboActivateProductKeyError,
+                        load_library, native_text, validate_result, wstr)
+
+#
+# Bulk product key validation
+#
+
+KeyResult = namedtuple("KeyResult", ["index", "key", "valid", "error"])
+
+BulkProgress = namedtuple("BulkProgress", ["done", "elapsed", "rate"])
+
+# TurboActivate instance owned by each worker process, or the reason it couldn't be created.
+_worker_ta = None
+_worker_error = None
+
+
+def read_keys(source, column=None):
+    """
+    Yields the product keys read from source, a path or a file object. Each line holds one
+    key, unless column is given: then source is read as CSV and column is either the index
+    or the header name of the column holding the keys.
+    """
+    if not hasattr(source, "read"):
+        with io.open(source, newline="") as f:
+            for key in read_keys(f, column):
+                yield key
+
+        return
+
+    if column is None:
+        rows = ([line] for line in source)
+        column = 0
+    else:
+        rows = csv.reader(source)
+
+        if not isinstance(column, int):
+            column = next(rows).index(column)
+
+    for row in rows:
+        if len(row) > column and row[column].strip():
+            yield row[column].strip()
+
+
+def _init_worker(dat_file, guid, library_folder, mode, data_root):
+    global _worker_ta, _worker_error
+
+    # Pool respawns workers whose initializer raises, forever: record the failure instead and
+    # report it with every key.
+    try:
+        # The activation data path must be set before any other call, so that saving product
+        # keys never touches the real activation data of the host.
+        lib = load_library(library_folder)
+        lib.TA_SetCustomActDataPath.restype = validate_result
+        lib.TA_SetCustomActDataPath(wstr(native_text(tempfile.mkdtemp(dir=data_root))))
+
+        _worker_ta = TurboActivate(dat_file, guid, mode=mode, library=lib)
+    except Exception as e:
+        _worker_ta = None
+        _worker_error = e.__class__.__name__
+
+
+def _validate(item):
+    index, key = item
+
+    if _worker_ta is None:
+        return KeyResult(index, key, False, _worker_error)
+
+    try:
+        _worker_ta.set_product_key(key)
+
+        return KeyResult(index, key, _worker_ta.is_product_key_valid(), None)
+    except (TurboActivateProductKeyError, TurboActivateFailError):
+        return KeyResult(index, key, False, None)
+    except Exception as e:
+        # Report any failure with its key, raising would abort the whole validation.
+        return KeyResult(index, key, False, e.__class__.__name__)
+
+
+def validate_keys(keys, dat_file, guid, library_folder="", mode=TA_USER, processes=None,
+                  chunksize=16, progress=None, progress_every=1000):
+    """
+    Validates many product keys across a pool of worker processes, yielding a KeyResult for
+    each key in the same order as keys, which can be any iterable (see read_keys()).
+
+    Each worker loads its own copy of the library and stores the activation data in a
+    private temporary folder, removed when validation is over. Since the activation data
+    path can't be changed on Linux, bulk validation is not available there.
+
+    If a worker can't load the library or the product, every key it handles is reported with
+    valid=False and the name of the exception as error.
+
+    If progress is given, it is called with a BulkProgress every progress_every keys and
+    once more at the end.
+    """
+    if sys.platform.startswith('linux'):
+        raise RuntimeError("validate_keys is not available under linux")
+
+    data_root = tempfile.mkdtemp(prefix="turboactivate-")
+    pool = Pool(processes, _init_worker, (dat_file, guid, library_folder, mode, data_root))
+    started = default_timer()
+    done = 0
+
+    def report():
+        elapsed = default_timer() - started
+        progress(BulkProgress(done, elapsed, done / elapsed if elapsed else 0.0))
+
+    try:
+        for result in pool.imap(_validate, enumerate(keys), chunksize):
+            done += 1
+
+            if progress and done % progress_every == 0:
+                report()
+
+            yield result
+
+        pool.close()
+        pool.join()
+
+        if progress:
+            report()
+    finally:
+        pool.terminate()
+        shutil.rmtree(data_root, ignore_errors=True)
@@ -38,6 +38,14 @@ wbuf = create_unicode_buffer if sys.platform == "win32" else create_string_buffe
 
 wstr = c_wchar_p if sys.platform == "win32" else c_char_p
 
+
+def native_text(text):
+    """Encodes text for a wstr argument where native strings are narrow."""
+    if wstr is c_char_p and not isinstance(text, bytes):
+        return text.encode("utf-8")
+
+    return text
+
 #
 # Wrapper
 #
@@ -122,12 +130,39 @@ class ACTIVATE_OPTIONS(Structure):
 
 def load_library(path):
     LIBRARIES = {
-        'linux2': ospath.join(path, 'libTurboActivate.so'),
+        'linux': ospath.join(path, 'libTurboActivate.so'),
         'darwin': ospath.join(path, 'libTurboActivate.dylib'),
         'win32': ospath.join(path, 'TurboActivate.dll'),
     }
 
-    return cdll.LoadLibrary(LIBRARIES[sys.platform])
+    # Python 2 reports 'linux2', Python 3 just 'linux'.
+    platform = 'linux' if sys.platform.startswith('linux') else sys.platform
+
+    return cdll.LoadLibrary(LIBRARIES[platform])
+
+
+# Functions whose return code is checked by validate_result()
+CHECKED_FUNCTIONS = (
+    "PDetsFromPath",
+    "TA_UseTrial",
+    "TA_GetPKey",
+    "TA_CheckAndSavePKey",
+    "TA_IsProductKeyValid",
+    "TA_DeactivationRequestToFile",
+    "TA_Deactivate",
+    "TA_Activate",
+    "TA_ActivationRequestToFile",
+    "TA_ActivateFromFile",
+    "TA_GetExtraData",
+    "TA_IsActivated",
+    "TA_IsGenuine",
+    "TA_IsGenuineEx",
+    "TA_TrialDaysRemaining",
+    "TA_ExtendTrial",
+    "TA_IsDateValid",
+    "SetCustomProxy",
+    "TA_SetCustomActDataPath",
+)
 
 
 def validate_result(return_code):
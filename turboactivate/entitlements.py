@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import ast
+import json
+import operator
+from datetime import datetime
+from threading import Lock
+
+from .c_wrapper import TurboActivateError
+
+#
+# Value parsers
+#
+
+_DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H-%M-%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d")
+
+
+def parse_text(value):
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+
+    return value
+
+
+def parse_bool(value):
+    return parse_text(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def parse_date(value):
+    value = parse_text(value).strip()
+
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+
+    raise ValueError("Unrecognized date: %r" % value)
+
+
+def parse_json(value):
+    return json.loads(parse_text(value))
+
+
+PARSERS = {
+    "str": parse_text,
+    "int": lambda value: int(parse_text(value)),
+    "float": lambda value: float(parse_text(value)),
+    "bool": parse_bool,
+    "date": parse_date,
+    "json": parse_json,
+}
+
+
+def _get_parser(kind):
+    if callable(kind):
+        return kind
+
+    try:
+        return PARSERS[kind]
+    except KeyError:
+        raise ValueError("Unknown feature type: %r" % kind)
+
+
+#
+# Feature gates
+#
+
+_COMPARISONS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+}
+
+
+def _date_literal(node):
+    """The parsed date if node is a string literal holding a date, None otherwise."""
+    if not isinstance(node, ast.Constant) or not isinstance(node.value, str):
+        return None
+
+    try:
+        return parse_date(node.value)
+    except ValueError:
+        return None
+
+
+def _compile_compare(node):
+    operands = [node.left] + node.comparators
+    evaluators = [_compile_node(operand) for operand in operands]
+    # Dates are compared against string literals, parse them once at compile time.
+    dates = [_date_literal(operand) for operand in operands]
+    comparisons = []
+
+    for op in node.ops:
+        if type(op) not in _COMPARISONS:
+            raise ValueError("Unsupported operator: %s" % type(op).__name__)
+
+        comparisons.append(_COMPARISONS[type(op)])
+
+    def evaluate(values):
+        current = evaluators[0](values)
+        current_date = dates[0]
+
+        for i, compare in enumerate(comparisons, 1):
+            other = evaluators[i](values)
+            lhs, rhs = current, other
+
+            if isinstance(lhs, datetime) and dates[i] is not None:
+                rhs = dates[i]
+            elif isinstance(rhs, datetime) and current_date is not None:
+                lhs = current_date
+
+            # A missing feature never satisfies a comparison.
+            if lhs is None or rhs is None:
+                return False
+
+            try:
+                if not compare(lhs, rhs):
+                    return False
+            except TypeError:
+                return False
+
+            current, current_date = other, dates[i]
+
+        return True
+
+    return evaluate
+
+
+def _compile_node(node):
+    if isinstance(node, ast.BoolOp):
+        operands = [_compile_node(value) for value in node.values]
+
+        if isinstance(node.op, ast.And):
+            return lambda values: all(operand(values) for operand in operands)
+
+        return lambda values: any(operand(values) for operand in operands)
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        operand = _compile_node(node.operand)
+
+        return lambda values: not operand(values)
+
+    if isinstance(node, ast.Compare):
+        return _compile_compare(node)
+
+    if isinstance(node, ast.Name):
+        name = node.id
+
+        return lambda values: values.get(name)
+
+    if isinstance(node, ast.Constant):
+        value = node.value
+
+        return lambda values: value
+
+    if isinstance(node, (ast.Tuple, ast.List)):
+        items = [_compile_node(item) for item in node.elts]
+
+        return lambda values: tuple(item(values) for item in items)
+
+    raise ValueError("Unsupported expression: %s" % type(node).__name__)
+
+
+class FeatureGate(object):
+    """
+    A boolean expression over feature names, compiled once and evaluated against a dict of
+    parsed feature values. For example: "pro and seats >= 10".
+
+    Supports and/or/not, comparisons (including in/not in) and literals. A bare name is true
+    when the feature is present and its value is truthy; comparisons involving a missing
+    feature are false.
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+
+        try:
+            tree = ast.parse(expression, mode="eval")
+        except SyntaxError as e:
+            raise ValueError("Invalid feature gate %r: %s" % (expression, e))
+
+        self._evaluate = _compile_node(tree.body)
+
+    def __call__(self, values):
+        return bool(self._evaluate(values))
+
+    def __repr__(self):
+        return "FeatureGate(%r)" % self.expression
+
+
+#
+# Entitlements
+#
+
+
+class Entitlements(object):
+    """
+    Typed view of the features of a product.
+
+    schema maps each feature name to its type, either one of the keys of PARSERS ("str",
+    "int", "float", "bool", "date", "json") or a callable taking the raw value. All features
+    are fetched and parsed once by refresh(); afterwards lookups and gate evaluations don't
+    call into TurboActivate.
+
+    When auto_refresh is True the features are fetched again whenever is_genuine() reports
+    that they have changed.
+    """
+
+    def __init__(self, ta, schema, auto_refresh=True):
+        self._ta = ta
+        self._schema = dict((name, _get_parser(kind)) for name, kind in schema.items())
+        self._values = {}
+        self._gates = {}
+        self._lock = Lock()
+
+        self.refresh()
+
+        if auto_refresh:
+            ta.on_features_changed(self.refresh)
+
+    def refresh(self):
+        """Fetches and parses all the features declared in the schema."""
+        values = {}
+
+        for name, parse in self._schema.items():
+            try:
+                raw = self._ta.get_feature_value(name)
+            except TurboActivateError:
+                continue
+
+            if not raw:
+                continue
+
+            try:
+                values[name] = parse(raw)
+            except ValueError as e:
+                raise ValueError("Invalid value for feature %r: %s" % (name, e))
+
+        # Swap the whole dict so that concurrent readers always see a consistent snapshot.
+        self._values = values
+
+    def get(self, name, default=None):
+        return self._values.get(name, default)
+
+    def has_feature(self, name):
+        return name in self._values
+
+    def values(self):
+        return dict(self._values)
+
+    def compile(self, expression):
+        """Returns the FeatureGate for expression, compiling it only the first time."""
+        with self._lock:
+            gate = self._gates.get(expression)
+
+            if gate is None:
+                gate = self._gates[expression] = FeatureGate(expression)
+
+        return gate
+
+    def allows(self, gate):
+        """Evaluates a FeatureGate, or an expression string, against the current features."""
+        if not isinstance(gate, FeatureGate):
+            gate = self.compile(gate)
+
+        return gate(self._values)
+
+    def __getitem__(self, name):
+        return self._values[name]
+
+    def __contains__(self, name):
+        return name in self._values
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import time
+from collections import namedtuple
+from threading import Event, Lock, Thread
+from timeit import default_timer
+
+from .c_wrapper import TurboActivateError
+from .entitlements import FeatureGate
+
+#
+# Background license verdict
+#
+
+LicenseVerdict = namedtuple("LicenseVerdict", ["activated", "features", "checked_at"])
+
+
+class LicenseMonitor(object):
+    """
+    Keeps an in-memory LicenseVerdict for ta, refreshed every interval seconds by a background
+    thread, so that checking the license costs no native calls.
+
+    features lists the feature names tracked in LicenseVerdict.features, a dict mapping each
+    name to whether the product has that feature.
+
+    A verdict older than max_age seconds (three intervals by default) is considered stale:
+    if refreshing keeps failing, current_verdict() returns None and requests are denied.
+    """
+
+    def __init__(self, ta, features=(), interval=60, max_age=None):
+        self._ta = ta
+        self._features = tuple(features)
+        self._interval = interval
+        self._max_age = max_age if max_age is not None else 3 * interval
+        self._verdict = None
+        self._lock = Lock()
+        self._stopped = Event()
+        self._thread = None
+        self.refresh_latency = None
+        self.refresh_count = 0
+        self.refresh_errors = 0
+
+    @property
+    def verdict(self):
+        """The current LicenseVerdict, or None if the license has never been checked."""
+        return self._verdict
+
+    def current_verdict(self):
+        """The current LicenseVerdict, or None if it is missing or stale."""
+        verdict = self._verdict
+
+        if verdict is None or time.monotonic() - verdict.checked_at > self._max_age:
+            return None
+
+        return verdict
+
+    def refresh(self):
+        """Checks the license right away and replaces the current verdict."""
+        with self._lock:
+            started = default_timer()
+
+            try:
+                features = dict((name, self._has_feature(name)) for name in self._features)
+                verdict = LicenseVerdict(self._ta.is_activated(), features, time.monotonic())
+            except Exception:
+                self.refresh_errors += 1
+                raise
+            finally:
+                self.refresh_latency = default_timer() - started
+
+            self._verdict = verdict
+            self.refresh_count += 1
+
+        return verdict
+
+    def start(self):
+        """Checks the license and starts refreshing it in the background."""
+        self.refresh()
+        self._stopped.clear()
+        self._thread = Thread(target=self._run, name="LicenseMonitor")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def verdict_age(self):
+        """Seconds since the current verdict was computed, or None."""
+        verdict = self._verdict
+
+        return time.monotonic() - verdict.checked_at if verdict is not None else None
+
+    def metrics(self):
+        return {
+            "verdict_age": self.verdict_age(),
+            "verdict_stale": self.current_verdict() is None,
+            "refresh_latency": self.refresh_latency,
+            "refresh_count": self.refresh_count,
+            "refresh_errors": self.refresh_errors,
+        }
+
+    def _has_feature(self, name):
+        try:
+            return self._ta.has_feature(name)
+        except TurboActivateError:
+            return False
+
+    def _run(self):
+        while not self._stopped.wait(self._interval):
+            try:
+                self.refresh()
+            except Exception:
+                # Keep serving the last verdict, the failure is counted in refresh_errors.
+                pass
+
+
+#
+# Middleware
+#
+
+
+class _LicenseGate(object):
+    def __init__(self, app, monitor, routes=(), require_activation=True, status=403):
+        """
+        routes is a sequence of (path_prefix, requirement) pairs, where requirement is a
+        FeatureGate expression over the features tracked by monitor, e.g. "pro and reports".
+        The first matching prefix applies. If require_activation is True every path also
+        requires the product to be activated. Every path is denied while the verdict of monitor
+        is missing or stale.
+        """
+        self.app = app
+        self.monitor = monitor
+        self._routes = [(prefix, FeatureGate(requirement)) for prefix, requirement in routes]
+        self._require_activation = require_activation
+        self._status = status
+
+    def _allows(self, path):
+        verdict = self.monitor.current_verdict()
+
+        if verdict is None:
+            return False
+
+        if self._require_activation and not verdict.activated:
+            return False
+
+        for prefix, gate in self._routes:
+            if path.startswith(prefix):
+                return gate(verdict.features)
+
+        return True
+
+
+_REASONS = {402: "Payment Required", 403: "Forbidden"}
+
+_DENIED_BODY = b"A valid license is required to access this resource.\n"
+
+
+class LicenseWSGIMiddleware(_LicenseGate):
+    """WSGI middleware denying requests not allowed by the verdict of a LicenseMonitor."""
+
+    def __call__(self, environ, start_response):
+        if self._allows(environ.get("PATH_INFO", "")):
+            return self.app(environ, start_response)
+
+        start_response("%d %s" % (self._status, _REASONS.get(self._status, "Denied")), [
+            ("Content-Type", "text/plain"),
+            ("Content-Length", str(len(_DENIED_BODY))),
+        ])
+
+        return [_DENIED_BODY]
+
+
+class LicenseASGIMiddleware(_LicenseGate):
+    """ASGI middleware denying requests not allowed by the verdict of a LicenseMonitor."""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket") or self._allows(scope.get("path", "")):
+            await self.app(scope, receive, send)
+            return
+
+        if scope["type"] == "websocket":
+            await send({"type": "websocket.close", "code": 1008})
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": self._status,
+            "headers": [
+                (b"content-type", b"text/plain"),
+                (b"content-length", str(len(_DENIED_BODY)).encode("ascii")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": _DENIED_BODY})
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""
+Soak test for long-running processes: hammers the wrapper against a StubLibrary from many
+threads and fails if memory, file descriptors or native handles keep growing.
+
+    python -m turboactivate.soak --duration 3600 --threads 16
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from threading import Event, Lock, Thread
+from weakref import WeakSet
+
+from . import TurboActivate
+from .c_wrapper import (TA_E_ACTIVATE, TA_E_FEATURES_CHANGED, TA_E_INET, TA_E_PKEY,
+                        TurboActivateConnectionError, validate_result)
+from .stub import StubLibrary
+
+SoakSample = namedtuple("SoakSample", ["elapsed", "iterations", "rss", "fds", "traced", "handles",
+                                       "handle_calls", "instances"])
+
+# Return codes making the wrapper go through its exception handling paths.
+STUB_RETURN_CODES = {
+    "TA_IsActivated": TA_E_ACTIVATE,
+    "TA_IsProductKeyValid": TA_E_PKEY,
+    "TA_IsGenuine": TA_E_FEATURES_CHANGED,
+}
+
+
+class _InstanceSet(object):
+    """Thread-safe set of weak references to the live TurboActivate instances."""
+
+    def __init__(self):
+        self._instances = WeakSet()
+        self._lock = Lock()
+
+    def add(self, ta):
+        with self._lock:
+            self._instances.add(ta)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._instances)
+
+
+class SoakFailure(Exception):
+    """Resource usage grew beyond the allowed threshold during the soak test."""
+    pass
+
+
+def _rss():
+    """Resident set size in bytes, or None if it can't be read on this platform."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (IOError, OSError):
+        return None
+
+
+def _fds():
+    """Number of open file descriptors, or None if it can't be read on this platform."""
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            pass
+
+    return None
+
+
+def _hammer(library, products, stopped, counters, index, instances, errors):
+    try:
+        while not stopped.is_set():
+            ta = TurboActivate(products[0][0], products[0][1], library=library)
+            instances.add(ta)
+
+            for dat_file, guid in products:
+                ta.set_current_product(dat_file, guid)
+                ta.product_key()
+                ta.get_extra_data()
+                ta.is_activated()
+                ta.is_product_key_valid()
+                ta.is_genuine()
+
+            try:
+                validate_result(TA_E_INET)
+            except TurboActivateConnectionError:
+                pass
+
+            counters[index] += 1
+    except Exception as e:
+        errors.append(e)
+        stopped.set()
+
+
+def soak(duration, threads=8, products=8, sample_interval=10, settle=30,
+         rss_threshold=16 << 20, traced_threshold=4 << 20, fd_threshold=8, report=None):
+    """
+    Runs the soak test for duration seconds and returns the list of SoakSample taken every
+    sample_interval seconds.
+
+    The first sample after settle seconds is the baseline: SoakFailure is raised as soon as
+    RSS or memory traced by tracemalloc grow more than rss_threshold or traced_threshold
+    bytes above it, or open file descriptors grow by more than fd_threshold. Handles are
+    checked on every sample, see _check_handles(). report, if given, is called with each
+    sample.
+    """
+    library = StubLibrary(STUB_RETURN_CODES)
+    products = [(("product%d.dat" % i).encode("ascii"), ("guid%d" % i).encode("ascii"))
+                for i in range(products)]
+    stopped = Event()
+    counters = [0] * threads
+    instances = _InstanceSet()
+    errors = []
+    samples = []
+    baseline = None
+
+    tracemalloc.start()
+    workers = [Thread(target=_hammer, args=(library, products, stopped, counters, i, instances,
+                                                   errors))
+               for i in range(threads)]
+    started = time.monotonic()
+
+    for worker in workers:
+        worker.daemon = True
+        worker.start()
+
+    try:
+        while not stopped.wait(sample_interval):
+            elapsed = time.monotonic() - started
+            # Read handle calls before iterations, so that every call counted belongs to an
+            # iteration either counted or still in flight.
+            handle_calls = library.get_handle_calls
+            sample = SoakSample(elapsed, sum(counters), _rss(), _fds(),
+                                tracemalloc.get_traced_memory()[0], library.handle_count(),
+                                handle_calls, len(instances))
+            samples.append(sample)
+
+            if report:
+                report(sample)
+
+            _check_handles(sample, len(products), threads)
+
+            if baseline is None:
+                if elapsed >= settle:
+                    baseline = sample
+                    baseline_snapshot = tracemalloc.take_snapshot()
+            else:
+                _check_growth(baseline, sample, baseline_snapshot, rss_threshold,
+                              traced_threshold, fd_threshold)
+
+            if elapsed >= duration:
+                break
+    finally:
+        stopped.set()
+
+        for worker in workers:
+            worker.join()
+
+        tracemalloc.stop()
+
+    if errors:
+        raise errors[0]
+
+    return samples
+
+
+def _check_handles(sample, products, threads):
+    """
+    Each iteration of a thread creates one TurboActivate instance and switches it through
+    every product, so it should ask for products + 1 handles, only ever see one handle per
+    product, and leave at most the instance it is using (and the one being replaced) alive.
+    """
+    failures = []
+    expected_calls = (sample.iterations + threads) * (products + 1)
+
+    if sample.handles > products:
+        failures.append("%d handles for %d products" % (sample.handles, products))
+
+    if sample.handle_calls > expected_calls:
+        failures.append("%d TA_GetHandle calls, at most %d expected" % (sample.handle_calls,
+                                                                         expected_calls))
+
+    if sample.instances > 2 * threads:
+        failures.append("%d TurboActivate instances alive for %d threads" % (sample.instances,
+                                                                            threads))
+
+    if failures:
+        raise SoakFailure("; ".join(failures))
+
+
+def _check_growth(baseline, sample, baseline_snapshot, rss_threshold, traced_threshold,
+                  fd_threshold):
+    failures = []
+
+    if sample.rss is not None and sample.rss - baseline.rss > rss_threshold:
+        failures.append("RSS grew by %d bytes" % (sample.rss - baseline.rss))
+
+    if sample.fds is not None and sample.fds - baseline.fds > fd_threshold:
+        failures.append("open file descriptors grew by %d" % (sample.fds - baseline.fds))
+
+    if sample.traced - baseline.traced > traced_threshold:
+        failures.append("traced memory grew by %d bytes, top allocations:\n%s" % (
+            sample.traced - baseline.traced,
+            "\n".join(str(stat) for stat in
+                      tracemalloc.take_snapshot().compare_to(baseline_snapshot, "lineno")[:10])))
+
+    if failures:
+        raise SoakFailure("; ".join(failures))
+
+
+def _positive_int(value):
+    number = int(value)
+
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1, got %s" % value)
+
+    return number
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m turboactivate.soak",
+                                     description="Soak test the TurboActivate wrapper.")
+    parser.add_argument("-d", "--duration", type=float, default=3600,
+                        help="seconds to run (default: 3600)")
+    parser.add_argument("-t", "--threads", type=_positive_int, default=8)
+    parser.add_argument("-p", "--products", type=_positive_int, default=8,
+                        help="products to swap between (default: 8)")
+    parser.add_argument("-i", "--sample-interval", type=float, default=10)
+    parser.add_argument("-s", "--settle", type=float, default=30,
+                        help="seconds before taking the baseline sample (default: 30)")
+    parser.add_argument("--rss-threshold", type=int, default=16 << 20, help="bytes")
+    parser.add_argument("--traced-threshold", type=int, default=4 << 20, help="bytes")
+    parser.add_argument("--fd-threshold", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    def report(sample):
+        print("%8.0fs %12d iterations  rss=%s fds=%s traced=%d handles=%d handle_calls=%d "
+              "instances=%d" % sample)
+
+    try:
+        soak(args.duration, threads=args.threads, products=args.products,
+             sample_interval=args.sample_interval, settle=args.settle,
+             rss_threshold=args.rss_threshold, traced_threshold=args.traced_threshold,
+             fd_threshold=args.fd_threshold, report=report)
+    except SoakFailure as e:
+        print("FAILED: %s" % e, file=sys.stderr)
+
+        return 1
+
+    print("OK")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
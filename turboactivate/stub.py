@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from ctypes import Array
+from threading import Lock
+
+from .c_wrapper import TA_OK
+
+#
+# In-process stand-in for the native library
+#
+
+
+class StubFunction(object):
+    """
+    A callable standing in for a native function. Like ctypes functions it honors a callable
+    restype, so validate_result() works unchanged.
+    """
+
+    def __init__(self, name, handler):
+        self.__name__ = name
+        self.restype = None
+        self._handler = handler
+
+    def __call__(self, *args):
+        result = self._handler(self.__name__, args)
+
+        if callable(self.restype):
+            return self.restype(result)
+
+        return result
+
+
+class StubLibrary(object):
+    """
+    Stands in for the TurboActivate library, e.g. TurboActivate(..., library=StubLibrary()).
+
+    Every function returns TA_OK unless overridden in return_codes, a dict mapping function
+    names to return codes. TA_GetHandle returns one handle per distinct GUID, like the real
+    library, and counts its calls in get_handle_calls. GetFeatureValue answers from features,
+    a dict mapping feature names to values (both text), and TA_TrialDaysRemaining from
+    trial_days.
+    """
+
+    def __init__(self, return_codes=None, features=None, trial_days=0):
+        self.return_codes = dict(return_codes or {})
+        self.features = dict(features or {})
+        self.trial_days = trial_days
+        self._handles = {}
+        self._lock = Lock()
+        self.get_handle_calls = 0
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        with self._lock:
+            fn = self.__dict__.get(name)
+
+            if fn is None:
+                fn = StubFunction(name, self.call)
+                setattr(self, name, fn)
+
+        return fn
+
+    def call(self, name, args):
+        """Returns the result of the native function name called with args."""
+        if name == "TA_GetHandle":
+            guid = getattr(args[0], "value", args[0])
+
+            with self._lock:
+                self.get_handle_calls += 1
+
+                return self._handles.setdefault(guid, len(self._handles) + 1)
+
+        if name == "GetFeatureValue":
+            return self._get_feature_value(*args)
+
+        if name == "TA_TrialDaysRemaining":
+            args[2].contents.value = self.trial_days
+
+        return self.return_codes.get(name, TA_OK)
+
+    def _get_feature_value(self, name, buf, buf_size):
+        name = name.value.decode("utf-8") if isinstance(name.value, bytes) else name.value
+        value = self.features.get(name)
+
+        # Like the native library: 0 for unknown features, the buffer size when buf is null.
+        if value is None:
+            return 0
+
+        if not isinstance(buf, Array):
+            return len(value.encode("utf-8")) + 1
+
+        buf.value = value.encode("utf-8") if isinstance(buf.value, bytes) else value
+
+        return TA_OK
+
+    def handle_count(self):
+        """Number of distinct handles given out by TA_GetHandle."""
+        return len(self._handles)
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import json
+import time
+from collections import deque
+from ctypes import Array, Structure
+from threading import Lock, local
+from timeit import default_timer
+
+from .c_wrapper import CHECKED_FUNCTIONS, validate_result
+from .stub import StubLibrary
+
+#
+# Recording
+#
+
+
+def _encode_arg(arg):
+    if arg is None or isinstance(arg, (int, float)):
+        return arg
+
+    if isinstance(arg, bytes):
+        return arg.decode("utf-8", "replace")
+
+    if isinstance(arg, str):
+        return arg
+
+    # Output buffers: only their size is meaningful.
+    if isinstance(arg, Array):
+        return {"buffer": len(arg)}
+
+    if hasattr(arg, "contents"):
+        contents = arg.contents
+
+        if isinstance(contents, Structure):
+            return dict((name, _encode_arg(getattr(contents, name)))
+                        for name, _ in contents._fields_)
+
+        return {"pointer": type(contents).__name__}
+
+    if hasattr(arg, "value"):
+        return _encode_arg(arg.value)
+
+    return {"type": type(arg).__name__}
+
+
+class _TracedFunction(object):
+    def __init__(self, recorder, name, fn):
+        self._recorder = recorder
+        self._name = name
+        self._fn = fn
+
+    def __call__(self, *args):
+        state = self._recorder._state
+        state.return_code = None
+        started = default_timer()
+
+        try:
+            return self._fn(*args)
+        finally:
+            self._recorder._record(self._name, args, state.return_code, started,
+                                   default_timer() - started)
+
+
+class _TracedLibrary(object):
+    def __init__(self, recorder, lib):
+        self._recorder = recorder
+        self._lib = lib
+        self._functions = {}
+
+    def __getattr__(self, name):
+        fn = self._functions.get(name)
+
+        if fn is None:
+            fn = getattr(self._lib, name)
+
+            if name in CHECKED_FUNCTIONS:
+                fn = self._functions[name] = _TracedFunction(self._recorder, name, fn)
+
+        return fn
+
+
+class TraceRecorder(object):
+    """
+    Records the native calls issued by TurboActivate instances, one JSON object per line:
+
+        {"ts": 0.0123, "fn": "TA_IsActivated", "args": [1], "rc": 0, "dur": 0.0004}
+
+    ts is the start time relative to the recorder creation and dur the duration of the call,
+    both in seconds. Only the functions in CHECKED_FUNCTIONS are recorded. Arguments may hold
+    product keys: pass record_args=False to leave them out.
+    """
+
+    def __init__(self, stream, record_args=True):
+        self._stream = stream
+        self._record_args = record_args
+        self._lock = Lock()
+        self._state = local()
+        self._started = default_timer()
+        self._attached = []
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def attach(self, ta):
+        """Starts recording the native calls issued by ta."""
+        if isinstance(ta._lib, _TracedLibrary):
+            raise ValueError("The native calls of %r are already being recorded" % ta)
+
+        lib = ta._lib
+        restypes = {}
+
+        for name in CHECKED_FUNCTIONS:
+            fn = getattr(lib, name, None)
+
+            if fn is not None:
+                restypes[name] = fn.restype
+                fn.restype = self._capture
+
+        ta._lib = _TracedLibrary(self, lib)
+        self._attached.append((ta, lib, restypes))
+
+    def detach(self, ta):
+        """Stops recording the native calls issued by ta, restoring its library."""
+        for i, (attached, lib, restypes) in enumerate(self._attached):
+            if attached is ta:
+                break
+        else:
+            raise ValueError("%r is not attached to this recorder" % ta)
+
+        for name, restype in restypes.items():
+            getattr(lib, name).restype = restype
+
+        ta._lib = lib
+        del self._attached[i]
+
+    def close(self):
+        """Detaches all the TurboActivate instances and closes the stream."""
+        while self._attached:
+            self.detach(self._attached[-1][0])
+
+        with self._lock:
+            self._closed = True
+            self._stream.close()
+
+    def _capture(self, return_code):
+        self._state.return_code = return_code
+
+        return validate_result(return_code)
+
+    def _record(self, name, args, return_code, started, duration):
+        record = {
+            "ts": round(started - self._started, 6),
+            "fn": name,
+            "rc": return_code,
+            "dur": round(duration, 6),
+        }
+
+        if self._record_args:
+            record["args"] = [_encode_arg(arg) for arg in args]
+
+        line = json.dumps(record, separators=(",", ":"))
+
+        with self._lock:
+            # Calls already in flight when the recorder is closed are dropped.
+            if not self._closed:
+                self._stream.write(line + "\n")
+
+
+def record_trace(ta, path, record_args=True):
+    """
+    Records the native calls issued by ta to the file at path. Returns the TraceRecorder, call
+    its close() method, or use it as a context manager, to stop recording.
+    """
+    recorder = TraceRecorder(io.open(path, "w", encoding="utf-8"), record_args=record_args)
+    recorder.attach(ta)
+
+    return recorder
+
+
+#
+# Replay
+#
+
+
+class ReplayError(Exception):
+    """The workload issued a call that isn't in the trace."""
+    pass
+
+
+def load_trace(source):
+    """Reads the records of a trace from source, a path or a file object."""
+    if not hasattr(source, "read"):
+        with io.open(source, encoding="utf-8") as f:
+            return load_trace(f)
+
+    return [json.loads(line) for line in source if line.strip()]
+
+
+class ReplayLibrary(StubLibrary):
+    """
+    Stands in for the TurboActivate library, answering each recorded function with the
+    return codes of the trace, in order, e.g. TurboActivate(..., library=ReplayLibrary(trace)).
+
+    If timing is True every call also takes as long as the recorded one, divided by speed.
+    Calling a recorded function more times than in the trace raises ReplayError; functions
+    that don't appear in the trace behave as in StubLibrary.
+    """
+
+    def __init__(self, records, timing=True, speed=1.0, return_codes=None):
+        super(ReplayLibrary, self).__init__(return_codes)
+        self._timing = timing
+        self._speed = speed
+        self._queues = {}
+
+        for record in records:
+            self._queues.setdefault(record["fn"], deque()).append((record["rc"], record["dur"]))
+
+    def call(self, name, args):
+        if name not in self._queues:
+            return super(ReplayLibrary, self).call(name, args)
+
+        try:
+            return_code, duration = self._queues[name].popleft()
+        except IndexError:
+            raise ReplayError("No more recorded calls to %s" % name)
+
+        if self._timing and duration:
+            time.sleep(duration / self._speed)
+
+        return return_code
+
+    def remaining(self):
+        """Number of recorded calls not replayed yet."""
+        return sum(len(queue) for queue in self._queues.values())
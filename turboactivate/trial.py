@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import time
+from threading import Lock
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+class TrialTracker(object):
+    """
+    Answers trial_days_remaining() locally by projecting the value read from TurboActivate
+    against the monotonic clock.
+
+    The tracker synchronizes with TurboActivate on first use, every resync_interval seconds,
+    after use_trial() or extend_trial() are called through it and whenever the wall clock
+    drifts from the monotonic clock by more than clock_jump_tolerance seconds (e.g. the
+    user changed the system date).
+    """
+
+    def __init__(self, ta, resync_interval=60 * 60, clock_jump_tolerance=60,
+                 monotonic=time.monotonic, wall_clock=time.time):
+        self._ta = ta
+        self._resync_interval = resync_interval
+        self._clock_jump_tolerance = clock_jump_tolerance
+        self._monotonic = monotonic
+        self._wall_clock = wall_clock
+        self._lock = Lock()
+        self._synced_at = None
+        self._synced_wall = None
+        self._expires_at = None
+
+    def days_remaining(self):
+        """
+        Get the number of trial days remaining, with the same semantic of
+        TurboActivate.trial_days_remaining().
+        """
+        with self._lock:
+            now = self._monotonic()
+
+            if self._needs_sync(now):
+                self._sync()
+                now = self._monotonic()
+
+            remaining = self._expires_at - now
+
+        if remaining <= 0:
+            return 0
+
+        return int(-(-remaining // SECONDS_PER_DAY))
+
+    def sync(self):
+        """Reads the trial days remaining from TurboActivate right away."""
+        with self._lock:
+            self._sync()
+
+    def invalidate(self):
+        """Forces a synchronization on the next call to days_remaining()."""
+        with self._lock:
+            self._synced_at = None
+
+    def use_trial(self):
+        self._ta.use_trial()
+        self.invalidate()
+
+    def extend_trial(self, extension_code):
+        self._ta.extend_trial(extension_code)
+        self.invalidate()
+
+    def _needs_sync(self, now):
+        if self._synced_at is None:
+            return True
+
+        elapsed = now - self._synced_at
+
+        if elapsed >= self._resync_interval:
+            return True
+
+        wall_elapsed = self._wall_clock() - self._synced_wall
+
+        return abs(wall_elapsed - elapsed) > self._clock_jump_tolerance
+
+    def _sync(self):
+        days = self._ta.trial_days_remaining()
+
+        self._synced_at = self._monotonic()
+        self._synced_wall = self._wall_clock()
+        self._expires_at = self._synced_at + days * SECONDS_PER_DAY
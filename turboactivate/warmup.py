@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2013-2018 Develer S.r.l. (https://www.develer.com/)
+#
+# Author: Lorenzo Villani <lvillani@develer.com>
+# Author: Riccardo Ferrazzo <rferrazz@develer.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from timeit import default_timer
+
+from . import TurboActivate
+
+#
+# Parallel initialization of multiple products
+#
+
+# Upper bound of the default number of threads, as in concurrent.futures.
+MAX_WORKERS = 32
+
+WarmUpResult = namedtuple("WarmUpResult", ["product", "instance", "activated", "error", "elapsed"])
+
+
+def _initialize(factory, product, check_activation):
+    started = default_timer()
+
+    try:
+        instance = factory(**product)
+        activated = instance.is_activated() if check_activation else None
+    except Exception as e:
+        return WarmUpResult(product, None, None, e, default_timer() - started)
+
+    return WarmUpResult(product, instance, activated, None, default_timer() - started)
+
+
+def warm_up(products, max_workers=None, check_activation=True, factory=None):
+    """
+    Initializes several products concurrently on a thread pool, so that startup costs about
+    as much as the slowest product instead of the sum of all of them.
+
+    Each item of products is a dict with the keyword arguments accepted by TurboActivate
+    (dat_file, guid, library_folder, mode, use_trial, verified_trials).
+
+    Returns a list of WarmUpResult, in the same order as products. Each result carries either
+    a ready-to-use instance or the exception raised while initializing that product, together
+    with the time spent on it in seconds. When check_activation is True the result also
+    reports whether the product is activated.
+
+    max_workers defaults to one thread per product, up to MAX_WORKERS.
+    """
+    factory = factory or TurboActivate
+    products = [dict(product) for product in products]
+
+    if not products:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max_workers or min(MAX_WORKERS, len(products))) as executor:
+        futures = [executor.submit(_initialize, factory, product, check_activation)
+                   for product in products]
+
+        return [future.result() for future in futures]